@@ -1,12 +1,30 @@
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 from pathlib import Path
 
+# como pacote (python -m src.analise) ou como script (python src/analise.py)
+try:
+    from .data_loader import CHUNKED_THRESHOLD, downcast_floats, read_csv, read_csv_chunked
+    from .fast_stats import correlation_matrix, describe_columns, lttb
+except ImportError:
+    from data_loader import CHUNKED_THRESHOLD, downcast_floats, read_csv, read_csv_chunked
+    from fast_stats import correlation_matrix, describe_columns, lttb
+
 # Configuração do matplotlib
 plt.rcParams['figure.figsize'] = (12, 8)
 plt.rcParams['font.size'] = 10
+# Simplificação agressiva de caminhos e desenho em blocos para séries longas
+plt.rcParams['path.simplify'] = True
+plt.rcParams['path.simplify_threshold'] = 1.0
+plt.rcParams['agg.path.chunksize'] = 10000
+
+# Rótulos das figuras reutilizadas entre arquivos (plt.subplots(num=..., clear=True))
+DATA_FIGURE = 'Dados ao Longo do Tempo'
+STATS_FIGURE = 'Estatísticas'
 
 def load_and_analyze_folder(folder_path, folder_name):
     """
@@ -20,12 +38,14 @@ def load_and_analyze_folder(folder_path, folder_name):
     print(f"ANALISANDO PASTA: {folder_name.upper()}")
     print(f"{'='*60}")
     
-    if not os.path.exists(folder_path):
+    # Listar todos os arquivos CSV (uma única varredura do diretório)
+    try:
+        with os.scandir(folder_path) as it:
+            entries = [e for e in it if e.is_file() and e.name.endswith('.csv')]
+    except FileNotFoundError:
         print(f"❌ Pasta '{folder_path}' não encontrada!")
         return
-    
-    # Listar todos os arquivos CSV
-    csv_files = [f for f in os.listdir(folder_path) if f.endswith('.csv')]
+    csv_files = [entry.name for entry in entries]
     
     if not csv_files:
         print(f"❌ Nenhum arquivo CSV encontrado em '{folder_path}'!")
@@ -35,54 +55,94 @@ def load_and_analyze_folder(folder_path, folder_name):
     for i, file in enumerate(csv_files, 1):
         print(f"   {i}. {file}")
     
-    # Processar cada arquivo
-    for csv_file in csv_files:
-        file_path = os.path.join(folder_path, csv_file)
-        print(f"\n🔍 Analisando: {csv_file}")
+    # Carregar e calcular estatísticas em paralelo; gráficos no processo principal.
+    # forkserver: um fork depois que o kernel paralelo do Numba (fast_stats) já rodou
+    # no processo principal herda o pool de threads dele e trava ou quebra o pool
+    with ProcessPoolExecutor(max_workers=os.cpu_count(),
+                             mp_context=multiprocessing.get_context("forkserver")) as executor:
+        futures = [executor.submit(_analyze_one, entry.path) for entry in entries]
         
-        try:
-            # Carregar dados
-            df = pd.read_csv(file_path)
-            print(f"   ✅ Carregado com sucesso: {len(df)} linhas, {len(df.columns)} colunas")
-            print(f"   📊 Colunas: {list(df.columns)}")
-            
-            # Criar timestamp se necessário
-            df_processed = create_timestamp(df.copy())
+        # Processar cada arquivo
+        for csv_file, future in zip(csv_files, futures):
+            print(f"\n🔍 Analisando: {csv_file}")
             
-            # Criar gráficos
-            create_data_plots(df_processed, csv_file, folder_name)
-            create_statistics_plots(df_processed, csv_file, folder_name)
-            
-        except Exception as e:
-            print(f"   ❌ Erro ao processar {csv_file}: {e}")
+            try:
+                result = future.result()
+                print(f"   ✅ Carregado com sucesso: {result['n_rows']} linhas, {len(result['columns'])} colunas")
+                print(f"   📊 Colunas: {result['columns']}")
+                
+                # Criar gráficos
+                df_processed = result['df']
+                create_data_plots(df_processed, csv_file, folder_name)
+                create_statistics_plots(df_processed, csv_file, folder_name,
+                                        stats_df=result['stats'], corr_matrix=result['corr'])
+                
+            except Exception as e:
+                print(f"   ❌ Erro ao processar {csv_file}: {e}")
+
+def _analyze_one(file_path):
+    """
+    Carrega um CSV e pré-calcula suas estatísticas (executado em um processo do pool).
+    
+    Não usa o matplotlib: a renderização dos gráficos permanece no processo principal.
+    """
+    # Carregar dados (arquivos muito grandes: estatísticas e correlação exatas calculadas
+    # em blocos + amostra para os gráficos, inclusive box plots e histogramas)
+    if os.path.getsize(file_path) > CHUNKED_THRESHOLD:
+        df, stats_df = read_csv_chunked(file_path)
+    else:
+        df, stats_df = read_csv(file_path), None
+    n_rows, columns = df.attrs.get('total_rows', len(df)), list(df.columns)
+    corr = df.attrs.pop('corr', None)
+    
+    # Criar coluna de tempo em horas
+    df_processed = downcast_floats(create_timestamp(df))
+    
+    numeric_cols = get_numeric_columns(df_processed)
+    if stats_df is None and numeric_cols:
+        stats_df = describe_columns(df_processed, numeric_cols)
+    if len(numeric_cols) < 2:
+        corr = None
+    elif corr is None:
+        corr = correlation_matrix(df_processed, numeric_cols)
+    return {
+        'df': df_processed,
+        'n_rows': n_rows,
+        'columns': columns,
+        'stats': stats_df,
+        'corr': corr,
+    }
 
 def create_timestamp(df):
     """
-    Cria coluna timestamp a partir das colunas de tempo disponíveis.
+    Cria coluna de tempo em horas (float32) a partir das colunas de tempo disponíveis.
     """
     if 'Time (s)' in df.columns:
         # Para dados de output do TCLab
-        df['timestamp'] = pd.to_datetime(df['Time (s)'], unit='s')
-        df['hours'] = df['Time (s)'] / 3600  # Para gráficos em horas
+        df['hours'] = df['Time (s)'].to_numpy(dtype=np.float32) * (1.0 / 3600.0)  # Para gráficos em horas
     elif 'Time' in df.columns:
         # Para dados de setpoints
-        df['timestamp'] = pd.to_datetime(df['Time'], unit='s')
-        df['hours'] = df['Time'] / 3600  # Para gráficos em horas
+        df['hours'] = df['Time'].to_numpy(dtype=np.float32) * (1.0 / 3600.0)  # Para gráficos em horas
     else:
-        # Fallback: criar timestamp sequencial
-        df['timestamp'] = pd.date_range(start='2023-01-01', periods=len(df), freq='s')
-        df['hours'] = range(len(df))
+        # Fallback: índice sequencial
+        df['hours'] = np.arange(len(df), dtype=np.float32)
     
     return df
 
+def get_numeric_columns(df):
+    """
+    Retorna as colunas numéricas, excluindo as colunas de tempo.
+    """
+    exclude_cols = ['hours', 'Time', 'Time (s)']
+    return [col for col in df.columns 
+            if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
+
 def create_data_plots(df, filename, folder_name):
     """
     Cria gráficos dos dados ao longo do tempo.
     """
-    # Identificar colunas numéricas (excluindo timestamp e hours)
-    exclude_cols = ['timestamp', 'hours', 'Time', 'Time (s)']
-    numeric_cols = [col for col in df.columns 
-                   if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
+    # Identificar colunas numéricas (excluindo colunas de tempo)
+    numeric_cols = get_numeric_columns(df)
     
     if not numeric_cols:
         print(f"   ⚠️  Nenhuma coluna numérica encontrada para plotar")
@@ -92,7 +152,9 @@ def create_data_plots(df, filename, folder_name):
     n_cols = len(numeric_cols)
     n_rows = (n_cols + 1) // 2  # 2 colunas por linha
     
-    fig, axes = plt.subplots(n_rows, 2, figsize=(15, 4 * n_rows))
+    # Reaproveita a figura (janela, canvas e renderer) do arquivo anterior, se ainda aberta
+    fig, axes = plt.subplots(n_rows, 2, figsize=(15, 4 * n_rows), num=DATA_FIGURE, clear=True)
+    fig.set_size_inches(15, 4 * n_rows)
     fig.suptitle(f'Dados ao Longo do Tempo - {filename}\n{folder_name}', fontsize=14, fontweight='bold')
     
     # Se só temos uma linha, garantir que axes seja uma lista
@@ -101,17 +163,20 @@ def create_data_plots(df, filename, folder_name):
     elif n_cols == 1:
         axes = axes.reshape(-1, 1)
     
+    # Médias de todas as colunas em uma única redução
+    means = df[numeric_cols].mean().to_numpy()
+    
     for i, col in enumerate(numeric_cols):
         row = i // 2
         col_idx = i % 2
         ax = axes[row, col_idx]
         
-        # Plotar dados
+        # Plotar dados (reduzidos com LTTB para ~2000 pontos)
         if 'hours' in df.columns:
-            ax.plot(df['hours'], df[col], linewidth=1.5, alpha=0.8)
+            ax.plot(*lttb(df['hours'].to_numpy(), df[col].to_numpy()), linewidth=1.5, alpha=0.8)
             ax.set_xlabel('Tempo (horas)')
         else:
-            ax.plot(df.index, df[col], linewidth=1.5, alpha=0.8)
+            ax.plot(*lttb(df.index.to_numpy(), df[col].to_numpy()), linewidth=1.5, alpha=0.8)
             ax.set_xlabel('Índice')
         
         ax.set_ylabel(col)
@@ -119,8 +184,7 @@ def create_data_plots(df, filename, folder_name):
         ax.grid(True, alpha=0.3)
         
         # Adicionar estatísticas no gráfico
-        mean_val = df[col].mean()
-        std_val = df[col].std()
+        mean_val = means[i]
         ax.axhline(mean_val, color='red', linestyle='--', alpha=0.7, label=f'Média: {mean_val:.2f}')
         ax.legend()
     
@@ -131,35 +195,24 @@ def create_data_plots(df, filename, folder_name):
     plt.tight_layout()
     plt.show()
 
-def create_statistics_plots(df, filename, folder_name):
+def create_statistics_plots(df, filename, folder_name, stats_df=None, corr_matrix=None):
     """
     Cria gráficos estatísticos dos dados.
+    
+    stats_df e corr_matrix podem vir pré-calculados (ver _analyze_one).
     """
     # Identificar colunas numéricas
-    exclude_cols = ['timestamp', 'hours', 'Time', 'Time (s)']
-    numeric_cols = [col for col in df.columns 
-                   if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
+    numeric_cols = get_numeric_columns(df)
     
     if not numeric_cols:
         return
     
-    # Calcular estatísticas
-    stats_data = []
-    for col in numeric_cols:
-        stats_data.append({
-            'Variável': col,
-            'Média': df[col].mean(),
-            'Mediana': df[col].median(),
-            'Desvio Padrão': df[col].std(),
-            'Mínimo': df[col].min(),
-            'Máximo': df[col].max(),
-            'Variância': df[col].var()
-        })
-    
-    stats_df = pd.DataFrame(stats_data)
+    # Calcular estatísticas (uma única passada sobre os dados; mediana via pandas)
+    if stats_df is None:
+        stats_df = describe_columns(df, numeric_cols)
     
     # Criar figura com múltiplos subplots para estatísticas
-    fig, axes = plt.subplots(2, 2, figsize=(15, 10))
+    fig, axes = plt.subplots(2, 2, figsize=(15, 10), num=STATS_FIGURE, clear=True)
     fig.suptitle(f'Estatísticas - {filename}\n{folder_name}', fontsize=14, fontweight='bold')
     
     # 1. Gráfico de barras - Médias e Medianas
@@ -201,9 +254,11 @@ def create_statistics_plots(df, filename, folder_name):
     
     # 3. Boxplot
     ax3 = axes[1, 0]
-    df_numeric = df[numeric_cols]
-    box_plot = ax3.boxplot([df_numeric[col].dropna() for col in numeric_cols], 
-                          tick_labels=numeric_cols, patch_artist=True)
+    # Uma única conversão para array e uma única máscara de NaN para todas as colunas
+    arr = df[numeric_cols].to_numpy(dtype=np.float64)
+    mask = ~np.isnan(arr)
+    cleaned = [arr[mask[:, j], j] for j in range(arr.shape[1])]
+    box_plot = ax3.boxplot(cleaned, tick_labels=numeric_cols, patch_artist=True)
     
     # Colorir boxplots
     colors = plt.cm.Set3(np.linspace(0, 1, len(numeric_cols)))
@@ -222,7 +277,8 @@ def create_statistics_plots(df, filename, folder_name):
     
     if len(numeric_cols) > 1:
         # Matriz de correlação se houver múltiplas variáveis
-        corr_matrix = df[numeric_cols].corr()
+        if corr_matrix is None:
+            corr_matrix = correlation_matrix(df, numeric_cols)
         im = ax4.imshow(corr_matrix, cmap='coolwarm', aspect='auto', vmin=-1, vmax=1)
         
         # Adicionar labels
@@ -232,11 +288,10 @@ def create_statistics_plots(df, filename, folder_name):
         ax4.set_yticklabels(numeric_cols)
         ax4.set_title('Matriz de Correlação')
         
-        # Adicionar valores na matriz
-        for i in range(len(numeric_cols)):
-            for j in range(len(numeric_cols)):
-                text = ax4.text(j, i, f'{corr_matrix.iloc[i, j]:.2f}',
-                               ha="center", va="center", color="black", fontsize=8)
+        # Adicionar valores na matriz (rótulos formatados de uma vez pelo NumPy)
+        labels = np.char.mod('%.2f', corr_matrix.to_numpy(dtype=np.float32))
+        for (i, j), label in np.ndenumerate(labels):
+            ax4.text(j, i, label, ha="center", va="center", color="black", fontsize=8)
         
         # Adicionar colorbar
         plt.colorbar(im, ax=ax4, shrink=0.8)
@@ -5,9 +5,31 @@ import plotly.express as px
 import plotly.graph_objects as go
 from plotly.subplots import make_subplots
 import dash
-from dash import dcc, html, Input, Output, callback_context
+from dash import dcc, html, dash_table, Input, Output, callback_context
+from dash.dash_table.Format import Format, Scheme
 from pathlib import Path
 
+try:
+    import pyarrow as pa  # type: ignore
+    _HAS_PYARROW = True
+except Exception:
+    pa = None  # type: ignore
+    _HAS_PYARROW = False
+
+try:
+    import flask_compress  # type: ignore  # noqa: F401
+    _HAS_FLASK_COMPRESS = True
+except Exception:
+    _HAS_FLASK_COMPRESS = False
+
+# como pacote (import src.analise_web, script tclab-analytics) ou como script (python src/analise_web.py)
+try:
+    from .data_loader import downcast_floats, read_csv_with_stats
+    from .fast_stats import correlation_matrix, describe_columns, lttb
+except ImportError:
+    from data_loader import downcast_floats, read_csv_with_stats
+    from fast_stats import correlation_matrix, describe_columns, lttb
+
 # Configuração de cores do tema
 COLORS = {
     'background': '#1e293b',     # Azul escuro
@@ -28,59 +50,83 @@ def load_csv_files():
     """Carrega todos os arquivos CSV das pastas setpoints e output"""
     files_data = {}
     
-    # Carregar setpoints
-    setpoints_path = Path("setpoints")
-    if setpoints_path.exists():
-        for file in setpoints_path.glob("*.csv"):
-            try:
-                df = pd.read_csv(file)
-                df = create_timestamp(df)
-                files_data[f"setpoints/{file.name}"] = {
-                    'data': df,
-                    'type': 'setpoints',
-                    'filename': file.name
-                }
-            except Exception as e:
-                print(f"Erro ao carregar {file}: {e}")
-    
-    # Carregar output
-    output_path = Path("output")
-    if output_path.exists():
-        for file in output_path.glob("*.csv"):
+    for file_type in ('setpoints', 'output'):
+        # Uma única varredura do diretório; is_file() usa o tipo já retornado por scandir
+        try:
+            with os.scandir(file_type) as it:
+                files = [Path(e.path) for e in it if e.is_file() and e.name.endswith('.csv')]
+        except FileNotFoundError:
+            continue
+        for file in files:
             try:
-                df = pd.read_csv(file)
-                df = create_timestamp(df)
-                files_data[f"output/{file.name}"] = {
-                    'data': df,
-                    'type': 'output',
-                    'filename': file.name
-                }
+                files_data[f"{file_type}/{file.name}"] = load_file(file, file_type)
             except Exception as e:
                 print(f"Erro ao carregar {file}: {e}")
     
     return files_data
 
+def load_file(file, file_type):
+    """
+    Carrega um CSV e pré-calcula tudo que o callback exibe: colunas numéricas,
+    estatísticas, matriz de correlação e as duas figuras Plotly
+    """
+    df, stats = read_csv_with_stats(file)
+    # arquivos lidos em blocos já trazem a correlação exata; os gráficos usam a amostra
+    corr = df.attrs.pop('corr', None)
+    df = downcast_floats(create_timestamp(df))
+    
+    numeric_cols = get_numeric_columns(df)
+    if stats is None and numeric_cols:
+        stats = describe_columns(df, numeric_cols)
+    if len(numeric_cols) < 2:
+        corr = None
+    elif corr is None:
+        corr = correlation_matrix(df, numeric_cols)
+    
+    # Arrow Table como armazenamento canônico das colunas (compartilha os buffers do DataFrame)
+    table = None
+    if _HAS_PYARROW:
+        table = pa.Table.from_pandas(df, preserve_index=False).combine_chunks()
+    
+    return {
+        'data': df,
+        'table': table,
+        'type': file_type,
+        'filename': file.name,
+        'numeric_cols': numeric_cols,
+        'stats': stats,
+        'corr': corr,
+        'data_fig': create_data_plot(df, file.name, file_type, stats, table),
+        'stats_fig': create_statistics_plot(df, file.name, stats, corr, table)
+    }
+
+def column_values(df, table, col):
+    """
+    Vista NumPy de uma coluna: sem cópia a partir da Arrow Table quando possível
+    (coluna numérica sem nulos); sem PyArrow, lida do DataFrame
+    """
+    if table is None:
+        return df[col].to_numpy()
+    return table.column(col).to_numpy()
+
 def create_timestamp(df):
-    """Cria coluna timestamp e hours para os dados"""
+    """Cria coluna hours (float32) para os dados"""
     if 'Time (s)' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['Time (s)'], unit='s')
-        df['hours'] = df['Time (s)'] / 3600
+        df['hours'] = df['Time (s)'].to_numpy(dtype=np.float32) * (1.0 / 3600.0)
     elif 'Time' in df.columns:
-        df['timestamp'] = pd.to_datetime(df['Time'], unit='s')
-        df['hours'] = df['Time'] / 3600
+        df['hours'] = df['Time'].to_numpy(dtype=np.float32) * (1.0 / 3600.0)
     else:
-        df['timestamp'] = pd.date_range(start='2023-01-01', periods=len(df), freq='s')
-        df['hours'] = range(len(df))
+        df['hours'] = np.arange(len(df), dtype=np.float32)
     return df
 
 def get_numeric_columns(df):
-    """Retorna colunas numéricas excluindo timestamp e time"""
-    exclude_cols = ['timestamp', 'hours', 'Time', 'Time (s)']
+    """Retorna colunas numéricas excluindo as colunas de tempo"""
+    exclude_cols = ['hours', 'Time', 'Time (s)']
     return [col for col in df.columns 
             if col not in exclude_cols and pd.api.types.is_numeric_dtype(df[col])]
 
-def create_data_plot(df, filename, file_type):
-    """Cria gráfico dos dados ao longo do tempo"""
+def create_data_plot(df, filename, file_type, stats_df=None, table=None):
+    """Cria gráfico dos dados ao longo do tempo (médias de stats_df, se fornecido)"""
     numeric_cols = get_numeric_columns(df)
     
     if not numeric_cols:
@@ -101,14 +147,21 @@ def create_data_plot(df, filename, file_type):
     
     colors = px.colors.qualitative.Set1
     
+    # Médias de todas as colunas em uma única redução
+    if stats_df is not None:
+        means = stats_df['Média'].to_numpy()
+    else:
+        means = df[numeric_cols].mean().to_numpy()
+    
     for i, col in enumerate(numeric_cols):
         color = colors[i % len(colors)]
         
-        # Adicionar linha dos dados
+        # Adicionar linha dos dados (reduzida com LTTB para ~2000 pontos)
+        xs, ys = lttb(column_values(df, table, 'hours'), column_values(df, table, col))
         fig.add_trace(
-            go.Scatter(
-                x=df['hours'],
-                y=df[col],
+            go.Scattergl(
+                x=xs,
+                y=ys,
                 mode='lines',
                 name=col,
                 line=dict(color=color, width=2),
@@ -118,7 +171,7 @@ def create_data_plot(df, filename, file_type):
         )
         
         # Adicionar linha da média
-        mean_val = df[col].mean()
+        mean_val = means[i]
         fig.add_hline(
             y=mean_val,
             line_dash="dash",
@@ -151,26 +204,16 @@ def create_data_plot(df, filename, file_type):
     
     return fig
 
-def create_statistics_plot(df, filename):
-    """Cria gráficos estatísticos"""
+def create_statistics_plot(df, filename, stats_df=None, corr_matrix=None, table=None):
+    """Cria gráficos estatísticos (usa stats_df e corr_matrix se já calculados no carregamento)"""
     numeric_cols = get_numeric_columns(df)
     
     if not numeric_cols:
         return go.Figure()
     
     # Calcular estatísticas
-    stats = []
-    for col in numeric_cols:
-        stats.append({
-            'Variável': col,
-            'Média': df[col].mean(),
-            'Mediana': df[col].median(),
-            'Desvio Padrão': df[col].std(),
-            'Mínimo': df[col].min(),
-            'Máximo': df[col].max()
-        })
-    
-    stats_df = pd.DataFrame(stats)
+    if stats_df is None:
+        stats_df = describe_columns(df, numeric_cols)
     
     # Criar subplots para estatísticas
     fig = make_subplots(
@@ -232,7 +275,7 @@ def create_statistics_plot(df, filename):
     for i, col in enumerate(numeric_cols):
         fig.add_trace(
             go.Box(
-                y=df[col],
+                y=column_values(df, table, col),
                 name=col,
                 marker_color=px.colors.qualitative.Set1[i % len(px.colors.qualitative.Set1)],
                 showlegend=False
@@ -243,7 +286,8 @@ def create_statistics_plot(df, filename):
     # 4. Correlação ou Histograma
     if len(numeric_cols) > 1:
         # Matriz de correlação
-        corr_matrix = df[numeric_cols].corr()
+        if corr_matrix is None:
+            corr_matrix = correlation_matrix(df, numeric_cols)
         fig.add_trace(
             go.Heatmap(
                 z=corr_matrix.values,
@@ -263,7 +307,7 @@ def create_statistics_plot(df, filename):
         # Histograma
         fig.add_trace(
             go.Histogram(
-                x=df[numeric_cols[0]],
+                x=column_values(df, table, numeric_cols[0]),
                 name=numeric_cols[0],
                 marker_color=COLORS['success'],
                 opacity=0.7,
@@ -298,59 +342,54 @@ def create_statistics_plot(df, filename):
     
     return fig
 
-def create_statistics_table(df):
-    """Cria tabela de estatísticas descritivas"""
+def create_statistics_table(df, stats_df=None):
+    """Cria tabela de estatísticas descritivas (usa stats_df se já calculado no carregamento)"""
     numeric_cols = get_numeric_columns(df)
     
     if not numeric_cols:
         return html.Div("Nenhuma coluna numérica encontrada")
     
-    stats_data = []
-    for col in numeric_cols:
-        stats_data.append([
-            col,
-            f"{df[col].mean():.3f}",
-            f"{df[col].median():.3f}",
-            f"{df[col].std():.3f}",
-            f"{df[col].min():.3f}",
-            f"{df[col].max():.3f}",
-            f"{df[col].var():.3f}"
-        ])
-    
-    return html.Table([
-        html.Thead([
-            html.Tr([
-                html.Th("Variável", style={'background-color': COLORS['primary']}),
-                html.Th("Média", style={'background-color': COLORS['primary']}),
-                html.Th("Mediana", style={'background-color': COLORS['primary']}),
-                html.Th("Desvio Padrão", style={'background-color': COLORS['primary']}),
-                html.Th("Mínimo", style={'background-color': COLORS['primary']}),
-                html.Th("Máximo", style={'background-color': COLORS['primary']}),
-                html.Th("Variância", style={'background-color': COLORS['primary']})
-            ])
-        ]),
-        html.Tbody([
-            html.Tr([
-                html.Td(cell, style={
-                    'background-color': COLORS['surface'] if i % 2 == 0 else COLORS['card'],
-                    'color': COLORS['text_primary'],
-                    'padding': '10px',
-                    'border': f'1px solid {COLORS["secondary"]}'
-                }) for cell in row
-            ]) for i, row in enumerate(stats_data)
-        ])
-    ], style={
-        'width': '100%',
-        'border-collapse': 'collapse',
-        'margin-top': '20px',
-        'box-shadow': f'0 4px 6px rgba(0, 0, 0, 0.1)'
-    })
+    if stats_df is None:
+        stats_df = describe_columns(df, numeric_cols)
+    
+    # Um único bloco de estilo para toda a tabela; linhas virtualizadas no navegador
+    return dash_table.DataTable(
+        data=stats_df.to_dict('records'),
+        columns=[
+            {'name': col, 'id': col} if col == 'Variável' else
+            {'name': col, 'id': col, 'type': 'numeric',
+             'format': Format(precision=3, scheme=Scheme.fixed)}
+            for col in stats_df.columns
+        ],
+        virtualization=True,
+        fixed_rows={'headers': True},
+        style_table={
+            'width': '100%',
+            'marginTop': '20px',
+            'boxShadow': '0 4px 6px rgba(0, 0, 0, 0.1)'
+        },
+        style_header={
+            'backgroundColor': COLORS['primary'],
+            'color': COLORS['text_primary'],
+            'fontWeight': 'bold'
+        },
+        style_cell={
+            'backgroundColor': COLORS['surface'],
+            'color': COLORS['text_primary'],
+            'padding': '10px',
+            'border': f'1px solid {COLORS["secondary"]}',
+            'textAlign': 'left'
+        },
+        style_data_conditional=[
+            {'if': {'row_index': 'odd'}, 'backgroundColor': COLORS['card']}
+        ]
+    )
 
 # Carregar dados
 files_data = load_csv_files()
 
-# Inicializar app Dash
-app = dash.Dash(__name__)
+# Inicializar app Dash (respostas JSON comprimidas com gzip se flask-compress estiver instalado)
+app = dash.Dash(__name__, compress=_HAS_FLASK_COMPRESS)
 app.title = "TCLab Analytics"
 
 # Layout da aplicação
@@ -466,7 +505,7 @@ def update_content(selected_file):
     info_card = html.Div([
         html.H3(f"📈 {filename}", style={'color': COLORS['text_primary'], 'margin-bottom': '15px'}),
         html.Div([
-            html.Span(f"📊 Linhas: {len(df):,}", style={'margin-right': '20px'}),
+            html.Span(f"📊 Linhas: {df.attrs.get('total_rows', len(df)):,}", style={'margin-right': '20px'}),
             html.Span(f"📋 Colunas: {len(df.columns)}", style={'margin-right': '20px'}),
             html.Span(f"🏷️ Tipo: {file_type.upper()}", style={'margin-right': '20px'}),
             html.Span(f"💾 Tamanho: {df.memory_usage(deep=True).sum() / 1024 / 1024:.1f} MB")
@@ -481,13 +520,13 @@ def update_content(selected_file):
     
     # Gráfico dos dados
     data_plot = dcc.Graph(
-        figure=create_data_plot(df, filename, file_type),
+        figure=data_info['data_fig'],
         style={'margin-bottom': '30px'}
     )
     
     # Gráfico de estatísticas
     stats_plot = dcc.Graph(
-        figure=create_statistics_plot(df, filename),
+        figure=data_info['stats_fig'],
         style={'margin-bottom': '30px'}
     )
     
@@ -497,7 +536,7 @@ def update_content(selected_file):
             'color': COLORS['text_primary'],
             'margin-bottom': '20px'
         }),
-        create_statistics_table(df)
+        create_statistics_table(df, data_info['stats'])
     ], style={
         'background-color': COLORS['card'],
         'padding': '20px',
@@ -0,0 +1,320 @@
+"""
+Funções de leitura dos arquivos CSV do projeto (setpoints e output do TCLab).
+
+Estratégia usada:
+- Usar o leitor CSV nativo do PyArrow (C++, multithread) sobre o arquivo mapeado
+  em memória quando disponível.
+- Informar os tipos das colunas conhecidas para evitar a inferência de tipos.
+- Cair para `pd.read_csv` quando o PyArrow não estiver instalado.
+- Com Polars instalado, varrer o CSV de forma lazy e calcular as estatísticas
+  descritivas na mesma consulta paralela que materializa os dados.
+- Guardar cada CSV já interpretado em um cache Feather v2 (`.cache/` na raiz do
+  projeto), chaveado por (caminho, mtime, tamanho); as leituras seguintes pulam o
+  parse do texto e só a versão mais recente de cada CSV fica no cache.
+- Arquivos maiores que CHUNKED_THRESHOLD são lidos em blocos: as estatísticas e a
+  matriz de correlação são acumuladas bloco a bloco e só uma amostra espaçada das
+  linhas fica em memória (os gráficos desses arquivos usam essa amostra).
+
+API principal:
+- read_csv(path)
+- load_fast(path)
+- collect_with_stats(lf)
+- read_csv_with_stats(path)
+- downcast_floats(df)
+- read_csv_chunked(path)
+"""
+from __future__ import annotations
+
+import hashlib
+import os
+from pathlib import Path
+from typing import List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# como parte do pacote src ou importado direto de src/
+try:
+    from .fast_stats import finalize_corr, finalize_stats, merge_stats, new_accumulator, stats_table
+except ImportError:
+    from fast_stats import finalize_corr, finalize_stats, merge_stats, new_accumulator, stats_table
+
+try:
+    import pyarrow as pa  # type: ignore
+    from pyarrow import csv as pacsv  # type: ignore
+    _HAS_PYARROW = True
+except Exception:
+    pa = None  # type: ignore
+    pacsv = None  # type: ignore
+    _HAS_PYARROW = False
+
+try:
+    import polars as pl  # type: ignore
+    _HAS_POLARS = True
+except Exception:
+    pl = None  # type: ignore
+    _HAS_POLARS = False
+
+
+# Tamanho do bloco lido por cada thread do parser do PyArrow
+_BLOCK_SIZE = 16 << 20
+
+# Pasta do cache Feather dos CSVs já interpretados (na raiz do projeto, qualquer que
+# seja o diretório de trabalho)
+CACHE_DIR = Path(__file__).resolve().parent.parent / ".cache"
+
+# Acima deste tamanho (bytes) o CSV é lido em blocos por read_csv_chunked
+CHUNKED_THRESHOLD = 1 << 30
+
+# Linhas por bloco e número aproximado de linhas mantidas para os gráficos
+CHUNK_ROWS = 1_000_000
+PLOT_POINTS = 20_000
+
+
+# Colunas de temperatura geradas pelas simulações e pelos setpoints (sempre float)
+_FLOAT_COLUMNS = ("T1", "T2", "T1_setpoint", "T2_setpoint")
+
+
+def _known_column_types() -> dict:
+    """
+    Tipos das colunas de temperatura geradas pelas simulações e pelos setpoints.
+
+    As colunas de tempo e dos aquecedores (int8/bool) continuam sendo inferidas.
+    """
+    return {col: pa.float64() for col in _FLOAT_COLUMNS}
+
+
+def _hash(text: str) -> str:
+    return hashlib.blake2b(text.encode(), digest_size=16).hexdigest()
+
+
+def _cache_path(path, kind: str) -> Path:
+    """
+    Arquivo de cache do CSV, invalidado quando o mtime ou o tamanho mudam.
+
+    O nome é `<hash do caminho>.<hash de mtime e tamanho>.<kind>.feather`, para que
+    as versões antigas do mesmo CSV possam ser encontradas e removidas.
+    """
+    st = os.stat(path)
+    path_key = _hash(os.path.abspath(path))
+    version_key = _hash(f"{st.st_mtime_ns}{st.st_size}")
+    return CACHE_DIR / f"{path_key}.{version_key}.{kind}.feather"
+
+
+def _prune_cache(cache_path: Path) -> None:
+    """Remove as versões antigas do mesmo CSV e tipo de `cache_path`."""
+    path_key, _, kind, _ = cache_path.name.split(".")
+    for old in CACHE_DIR.glob(f"{path_key}.*.{kind}.feather"):
+        if old != cache_path:
+            old.unlink(missing_ok=True)
+
+
+def _read_cache(cache_path: Path) -> Optional[pd.DataFrame]:
+    if not _HAS_PYARROW or not cache_path.exists():
+        return None
+    return pd.read_feather(cache_path)
+
+
+def _write_cache(cache_path: Path, df: pd.DataFrame) -> None:
+    """
+    Grava o cache de forma atômica e remove as versões antigas do mesmo CSV.
+
+    Falhas de escrita apenas desativam o cache.
+    """
+    if not _HAS_PYARROW:
+        return
+    tmp_path = cache_path.with_name(f"{cache_path.name}.{os.getpid()}.tmp")
+    try:
+        CACHE_DIR.mkdir(exist_ok=True)
+        df.to_feather(tmp_path)
+        os.replace(tmp_path, cache_path)
+        _prune_cache(cache_path)
+    except OSError:
+        tmp_path.unlink(missing_ok=True)
+
+
+def read_csv(path) -> pd.DataFrame:
+    """
+    Lê um arquivo CSV para um DataFrame pandas.
+
+    - path: caminho do arquivo CSV
+
+    Usa o cache Feather se o arquivo não mudou desde a última leitura.
+    """
+    cache_path = _cache_path(path, "data")
+    df = _read_cache(cache_path)
+    if df is None:
+        df = _parse_csv(path)
+        _write_cache(cache_path, df)
+    return df
+
+
+def _parse_csv(path) -> pd.DataFrame:
+    """Usa o parser multithread do PyArrow se instalado; caso contrário, `pd.read_csv`."""
+    if not _HAS_PYARROW:
+        return pd.read_csv(path)
+
+    # o parser lê direto das páginas mapeadas (page cache), sem cópia para um buffer próprio
+    with pa.memory_map(os.fspath(path), "r") as source:
+        table = pacsv.read_csv(
+            source,
+            read_options=pacsv.ReadOptions(use_threads=True, block_size=_BLOCK_SIZE),
+            convert_options=pacsv.ConvertOptions(column_types=_known_column_types()),
+        )
+    return table.to_pandas(self_destruct=True, split_blocks=True)
+
+
+# Colunas de tempo, que não entram nas estatísticas
+_TIME_COLUMNS = ("Time", "Time (s)")
+
+# Estatísticas calculadas: (nome da coluna no resultado, agregação do Polars)
+_STATS = (
+    ("Média", "mean"),
+    ("Mediana", "median"),
+    ("Desvio Padrão", "std"),
+    ("Mínimo", "min"),
+    ("Máximo", "max"),
+    ("Variância", "var"),
+)
+
+
+def load_fast(path):
+    """
+    Retorna um `pl.LazyFrame` que varre o CSV sob demanda (requer Polars).
+
+    O Polars infere os tipos só pelas primeiras linhas; as colunas de temperatura
+    são fixadas como Float64 para que um valor decimal tardio não quebre a leitura.
+    """
+    if not _HAS_POLARS:
+        raise RuntimeError("polars não está instalado. Use read_csv().")
+    return pl.scan_csv(path, schema_overrides={col: pl.Float64 for col in _FLOAT_COLUMNS})
+
+
+def _numeric_columns(lf) -> List[str]:
+    """Colunas numéricas (ou booleanas) do LazyFrame, exceto as de tempo."""
+    return [
+        name for name, dtype in lf.collect_schema().items()
+        if name not in _TIME_COLUMNS and (dtype.is_numeric() or dtype == pl.Boolean)
+    ]
+
+
+def collect_with_stats(lf) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Materializa o LazyFrame e calcula as estatísticas descritivas das colunas numéricas.
+
+    As duas consultas são executadas juntas por `pl.collect_all`, que paraleliza
+    as agregações por coluna e reaproveita a varredura do arquivo.
+
+    Retorna (dados como DataFrame pandas, tabela de estatísticas com uma linha por variável).
+    """
+    numeric_cols = _numeric_columns(lf)
+    stats_lf = lf.select([
+        getattr(pl.col(col).cast(pl.Float64), agg)().alias(f"{col}|{label}")
+        for col in numeric_cols
+        for label, agg in _STATS
+    ])
+    data, stats = pl.collect_all([lf, stats_lf])
+
+    row = stats.row(0, named=True)
+    stats_df = pd.DataFrame([
+        {"Variável": col, **{label: row[f"{col}|{label}"] for label, _ in _STATS}}
+        for col in numeric_cols
+    ])
+    return data.to_pandas(), stats_df
+
+
+def read_csv_with_stats(path) -> Tuple[pd.DataFrame, Optional[pd.DataFrame]]:
+    """
+    Lê um CSV e, se o Polars estiver instalado, já retorna as estatísticas descritivas.
+
+    Sem Polars, ou se o Polars não conseguir interpretar o arquivo com os tipos que
+    inferiu, retorna (read_csv(path), None) e as estatísticas ficam a cargo do chamador.
+    Dados e estatísticas são guardados no cache Feather. Arquivos maiores que
+    CHUNKED_THRESHOLD são delegados a read_csv_chunked.
+    """
+    if os.path.getsize(path) > CHUNKED_THRESHOLD:
+        return read_csv_chunked(path)
+    if not _HAS_POLARS:
+        return read_csv(path), None
+
+    data_cache, stats_cache = _cache_path(path, "data"), _cache_path(path, "stats")
+    df, stats = _read_cache(data_cache), _read_cache(stats_cache)
+    if df is None or stats is None:
+        try:
+            df, stats = collect_with_stats(load_fast(path))
+        except pl.exceptions.ComputeError:
+            # tipo inferido nas primeiras linhas não vale para o resto da coluna
+            return read_csv(path), None
+        _write_cache(data_cache, df)
+        _write_cache(stats_cache, stats)
+    return df, stats
+
+
+def downcast_floats(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Converte as colunas float64 para float32.
+
+    Os dados do TCLab são leituras de sensor de baixa precisão; em float32 o DataFrame
+    ocupa metade da memória e as reduções (média, desvio, correlação) leem metade dos bytes.
+    """
+    cols = df.select_dtypes("float64").columns
+    if len(cols):
+        df[cols] = df[cols].astype(np.float32)
+    return df
+
+
+def read_csv_chunked(
+    path,
+    chunksize: int = CHUNK_ROWS,
+    target_points: int = PLOT_POINTS,
+) -> Tuple[pd.DataFrame, pd.DataFrame]:
+    """
+    Lê um CSV grande em blocos, sem materializar o arquivo inteiro.
+
+    - path: caminho do arquivo CSV
+    - chunksize: linhas por bloco
+    - target_points: número aproximado de linhas mantidas para os gráficos
+
+    Retorna (amostra espaçada das linhas, tabela de estatísticas). Média, desvio,
+    variância, mínimo, máximo e a matriz de correlação são exatos; a mediana é
+    estimada a partir da amostra. Tudo o que for calculado depois sobre a amostra
+    (box plots, histogramas, gráficos das séries) também é aproximado.
+
+    O total de linhas do arquivo fica em `amostra.attrs['total_rows']` e a matriz de
+    correlação exata em `amostra.attrs['corr']`.
+    """
+    acc = None
+    numeric_cols: List[str] = []
+    stride = 1
+    kept: List[pd.DataFrame] = []
+    total_rows = 0
+
+    for chunk in pd.read_csv(path, chunksize=chunksize):
+        if acc is None:
+            numeric_cols = [
+                col for col in chunk.columns
+                if col not in _TIME_COLUMNS and pd.api.types.is_numeric_dtype(chunk[col])
+            ]
+            acc = new_accumulator(len(numeric_cols))
+        merge_stats(acc, chunk[numeric_cols].to_numpy(dtype=np.float64))
+        total_rows += len(chunk)
+
+        # mantém as linhas de índice global múltiplo de `stride`; ao passar de
+        # 2 * target_points, dobra o passo e descarta metade da amostra
+        kept.append(chunk[chunk.index % stride == 0])
+        while sum(len(part) for part in kept) > 2 * target_points:
+            stride *= 2
+            kept = [part[part.index % stride == 0] for part in kept]
+
+    if acc is None:
+        return pd.read_csv(path), None
+
+    sample = pd.concat(kept, ignore_index=True)
+    stats = stats_table(
+        numeric_cols,
+        finalize_stats(acc),
+        sample[numeric_cols].median().to_numpy(),
+    )
+    sample.attrs["total_rows"] = total_rows
+    sample.attrs["corr"] = finalize_corr(acc, numeric_cols)
+    return sample, stats
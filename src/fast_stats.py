@@ -0,0 +1,278 @@
+"""
+Estatísticas descritivas por coluna calculadas em uma única passada sobre os dados.
+
+Estratégia usada:
+- Kernel Numba (JIT, paralelo entre colunas) com o algoritmo online de Welford,
+  que obtém média, variância, mínimo e máximo de cada coluna em uma só leitura.
+- Fallback em NumPy quando o Numba não estiver instalado.
+- A mediana continua no pandas, pois exige ordenação.
+- Matriz de correlação via `np.corrcoef` (BLAS) sobre uma matriz float32 contígua.
+- Acumulador incremental (fusão de Welford em paralelo, Chan et al.) para arquivos
+  lidos em blocos, sem manter todas as linhas em memória; inclui a matriz de
+  co-momentos, de modo que a correlação também é exata.
+- Redução de séries longas para os gráficos com LTTB (Largest-Triangle-Three-Buckets).
+
+API principal:
+- col_stats(a)
+- describe_columns(df, numeric_cols)
+- correlation_matrix(df, numeric_cols)
+- new_accumulator(k) / merge_stats(acc, block) / finalize_stats(acc) / finalize_corr(acc, numeric_cols)
+- stats_table(numeric_cols, stats, medians)
+- lttb(x, y, n_out)
+"""
+from __future__ import annotations
+
+import sys
+import warnings
+from typing import Dict, List
+
+import numpy as np
+import pandas as pd
+
+try:
+    from numba import njit, prange  # type: ignore
+    _HAS_NUMBA = True
+except Exception:
+    njit = prange = None  # type: ignore
+    _HAS_NUMBA = False
+
+# O cache do Numba (cache=True) é indexado pelo arquivo, mas cada entrada guarda o nome
+# do módulo que a gravou e o importa de novo ao carregá-la. Este módulo é importado
+# como `fast_stats` (scripts em src/) ou `src.fast_stats` (pacote): registrá-lo com
+# os dois nomes permite carregar as entradas gravadas por qualquer um dos modos.
+if __name__ in ("fast_stats", "src.fast_stats"):
+    sys.modules.setdefault(
+        "fast_stats" if __name__ == "src.fast_stats" else "src.fast_stats",
+        sys.modules[__name__],
+    )
+
+
+# Ordem das colunas retornadas por col_stats
+MEAN, VAR, MIN, MAX = range(4)
+
+if _HAS_NUMBA:
+    # fastmath sem 'nnan'/'ninf', para que o teste x != x (NaN) não seja eliminado
+    @njit(parallel=True, fastmath={"nsz", "arcp", "contract", "afn", "reassoc"}, cache=True)
+    def _col_stats_kernel(a):
+        n, k = a.shape
+        out = np.full((k, 4), np.nan)
+        for j in prange(k):
+            count = 0
+            mean = 0.0
+            m2 = 0.0
+            mn = np.inf
+            mx = -np.inf
+            for i in range(n):
+                x = a[i, j]
+                if x != x:
+                    continue
+                count += 1
+                delta = x - mean
+                mean += delta / count
+                m2 += (x - mean) * delta
+                if x < mn:
+                    mn = x
+                if x > mx:
+                    mx = x
+            if count > 0:
+                out[j, 0] = mean
+                out[j, 2] = mn
+                out[j, 3] = mx
+            if count > 1:
+                out[j, 1] = m2 / (count - 1)
+        return out
+
+
+def col_stats(a: np.ndarray) -> np.ndarray:
+    """
+    Calcula média, variância amostral, mínimo e máximo de cada coluna de `a`.
+
+    - a: matriz 2D (linhas x colunas); NaNs são ignorados
+
+    Retorna matriz (colunas x 4) na ordem MEAN, VAR, MIN, MAX.
+    """
+    # layout por coluna: o kernel percorre cada coluna de forma contígua
+    a = np.asfortranarray(a, dtype=np.float64)
+    if _HAS_NUMBA:
+        return _col_stats_kernel(a)
+
+    with warnings.catch_warnings():
+        # colunas só com NaN (ou com um único valor, na variância) resultam em NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        out = np.column_stack([
+            np.nanmean(a, axis=0),
+            np.nanvar(a, axis=0, ddof=1),
+            np.nanmin(a, axis=0),
+            np.nanmax(a, axis=0),
+        ])
+    return out
+
+
+def describe_columns(df: pd.DataFrame, numeric_cols: List[str]) -> pd.DataFrame:
+    """
+    Tabela de estatísticas descritivas (uma linha por variável).
+
+    Colunas: Variável, Média, Mediana, Desvio Padrão, Mínimo, Máximo, Variância.
+    """
+    stats = col_stats(df[numeric_cols].to_numpy(dtype=np.float64))
+    return stats_table(numeric_cols, stats, df[numeric_cols].median().to_numpy())
+
+
+def stats_table(numeric_cols: List[str], stats: np.ndarray, medians: np.ndarray) -> pd.DataFrame:
+    """Monta a tabela de estatísticas a partir da saída de col_stats/finalize_stats."""
+    return pd.DataFrame({
+        "Variável": numeric_cols,
+        "Média": stats[:, MEAN],
+        "Mediana": medians,
+        "Desvio Padrão": np.sqrt(stats[:, VAR]),
+        "Mínimo": stats[:, MIN],
+        "Máximo": stats[:, MAX],
+        "Variância": stats[:, VAR],
+    })
+
+
+def correlation_matrix(df: pd.DataFrame, numeric_cols: List[str]) -> pd.DataFrame:
+    """
+    Matriz de correlação de Pearson entre as colunas.
+
+    Sem NaNs, usa `np.corrcoef` em float32 (uma multiplicação de matrizes via BLAS);
+    com NaNs, mantém o tratamento par-a-par de `DataFrame.corr`.
+    """
+    arr = np.ascontiguousarray(df[numeric_cols].to_numpy(dtype=np.float32).T)
+    if np.isnan(arr).any():
+        return df[numeric_cols].corr()
+
+    with warnings.catch_warnings():
+        # colunas constantes têm desvio padrão zero e correlação NaN, como no pandas
+        warnings.simplefilter("ignore", RuntimeWarning)
+        corr = np.corrcoef(arr, dtype=np.float32)
+    return pd.DataFrame(np.atleast_2d(corr), index=numeric_cols, columns=numeric_cols)
+
+
+def new_accumulator(k: int) -> Dict[str, np.ndarray]:
+    """
+    Acumulador vazio para `k` colunas (contagem, média, M2, mínimo e máximo) e
+    para a matriz de co-momentos das linhas completas (sem NaN).
+    """
+    return {
+        "count": np.zeros(k),
+        "mean": np.zeros(k),
+        "m2": np.zeros(k),
+        "min": np.full(k, np.inf),
+        "max": np.full(k, -np.inf),
+        "co_count": np.zeros(()),
+        "co_mean": np.zeros(k),
+        "comoment": np.zeros((k, k)),
+    }
+
+
+def merge_stats(acc: Dict[str, np.ndarray], block: np.ndarray) -> None:
+    """
+    Incorpora um bloco (linhas x colunas) ao acumulador.
+
+    As estatísticas do bloco saem de col_stats e são combinadas com as já acumuladas
+    pela fórmula de Chan et al. para a fusão de Welford; NaNs são ignorados.
+    """
+    block = np.asarray(block, dtype=np.float64)
+    stats = col_stats(block)
+    n_b = np.count_nonzero(~np.isnan(block), axis=0).astype(np.float64)
+    mean_b = np.where(n_b > 0, stats[:, MEAN], 0.0)
+    m2_b = np.where(n_b > 1, stats[:, VAR] * (n_b - 1), 0.0)
+
+    n_a = acc["count"]
+    n = n_a + n_b
+    with np.errstate(divide="ignore", invalid="ignore"):
+        weight_b = np.where(n > 0, n_b / n, 0.0)
+    delta = mean_b - acc["mean"]
+
+    acc["mean"] = acc["mean"] + delta * weight_b
+    acc["m2"] = acc["m2"] + m2_b + delta * delta * n_a * weight_b
+    acc["count"] = n
+    acc["min"] = np.fmin(acc["min"], stats[:, MIN])
+    acc["max"] = np.fmax(acc["max"], stats[:, MAX])
+
+    # co-momentos (soma dos produtos cruzados centrados), só com as linhas sem NaN
+    rows = block[~np.isnan(block).any(axis=1)]
+    m = len(rows)
+    if m:
+        mean_r = rows.mean(axis=0)
+        centered = rows - mean_r
+        n_a = acc["co_count"]
+        n = n_a + m
+        delta = mean_r - acc["co_mean"]
+        acc["co_mean"] = acc["co_mean"] + delta * (m / n)
+        acc["comoment"] = acc["comoment"] + centered.T @ centered + np.outer(delta, delta) * (n_a * m / n)
+        acc["co_count"] = n
+
+
+def finalize_stats(acc: Dict[str, np.ndarray]) -> np.ndarray:
+    """Converte o acumulador na mesma matriz (colunas x 4) retornada por col_stats."""
+    count = acc["count"]
+    out = np.full((len(count), 4), np.nan)
+    has = count > 0
+    out[has, MEAN] = acc["mean"][has]
+    out[has, MIN] = acc["min"][has]
+    out[has, MAX] = acc["max"][has]
+    many = count > 1
+    out[many, VAR] = acc["m2"][many] / (count[many] - 1)
+    return out
+
+
+def finalize_corr(acc: Dict[str, np.ndarray], numeric_cols: List[str]) -> pd.DataFrame:
+    """
+    Matriz de correlação de Pearson a partir dos co-momentos do acumulador.
+
+    Considera apenas as linhas sem NaN em nenhuma coluna (e não os pares completos
+    de cada par de colunas, como `DataFrame.corr`); sem NaNs, os resultados coincidem.
+    """
+    comoment = acc["comoment"]
+    std = np.sqrt(np.diag(comoment))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        # colunas constantes têm desvio padrão zero e correlação NaN, como no pandas
+        corr = comoment / np.outer(std, std)
+    return pd.DataFrame(corr, index=numeric_cols, columns=numeric_cols)
+
+
+def _lttb_indices(x, y, n_out):
+    """Índices escolhidos pelo LTTB: um ponto por bucket, o de maior triângulo."""
+    n = len(x)
+    idx = np.empty(n_out, dtype=np.int64)
+    idx[0] = 0
+    idx[n_out - 1] = n - 1
+    every = (n - 2) / (n_out - 2)
+    a = 0
+    for i in range(n_out - 2):
+        # média do próximo bucket (no último, o próprio ponto final)
+        next_start = int((i + 1) * every) + 1
+        next_end = min(int((i + 2) * every) + 1, n)
+        avg_x = x[next_start:next_end].mean()
+        avg_y = y[next_start:next_end].mean()
+
+        start = int(i * every) + 1
+        end = int((i + 1) * every) + 1
+        area = np.abs(
+            (x[a] - avg_x) * (y[start:end] - y[a])
+            - (x[a] - x[start:end]) * (avg_y - y[a])
+        )
+        a = start + np.argmax(area)
+        idx[i + 1] = a
+    return idx
+
+
+if _HAS_NUMBA:
+    _lttb_indices = njit(cache=True)(_lttb_indices)
+
+
+def lttb(x, y, n_out: int = 2000):
+    """
+    Reduz a série (x, y) a `n_out` pontos preservando sua forma visual (LTTB).
+
+    Séries com até `n_out` pontos são retornadas sem alteração.
+    Retorna (x reduzido, y reduzido) como arrays NumPy.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    if n_out < 3 or len(x) <= n_out:
+        return x, y
+    idx = _lttb_indices(x, y, n_out)
+    return x[idx], y[idx]
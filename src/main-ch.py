@@ -1,116 +1,172 @@
+import os
 import tclab
 import time
 import pandas as pd
 import numpy as np
 from typing import Literal
 
+# como pacote (python -m src.main-ch) ou como script (python src/main-ch.py)
+try:
+  from .sim_output import BLOCK_ROWS, open_writer, setpoint_schedule, write_block
+except ImportError:
+  from sim_output import BLOCK_ROWS, open_writer, setpoint_schedule, write_block
+
+
+def _onoff_hysteresis(t1, sp1, t2, sp2, prev_q1, prev_q2, band):
+  """
+  Decisão ON/OFF com histerese: liga abaixo de sp - band, desliga acima de
+  sp + band e, dentro da banda, mantém o estado anterior do aquecedor.
+  """
+  if t1 < sp1 - band:
+    q1 = 1
+  elif t1 > sp1 + band:
+    q1 = 0
+  else:
+    q1 = prev_q1
+
+  if t2 < sp2 - band:
+    q2 = 1
+  elif t2 > sp2 + band:
+    q2 = 0
+  else:
+    q2 = prev_q2
+  return q1, q2
+
 
 def run_simulation(
     duration_minutes: float = 60 * 24 * 7,  # 7 dias padrão
     speedup_factor: int = 600,
     temp_precision: Literal['float64', 'float32', 'float16'] = 'float16',
-    heater_type: Literal['int8', 'bool'] = 'int8',
+    heater_type: Literal['int8', 'bool'] = 'bool',
     setpoints_t1: dict | None = None,
-    setpoints_t2: dict | None = None
+    setpoints_t2: dict | None = None,
+    output_format: Literal['csv', 'parquet', 'feather'] = 'csv'
 ):
-  
+  """
+  Executa a simulação do TCLab com controle ON/OFF com histerese (banda de 0,5 °C).
+
+  O tempo é gravado como uint32 (até ~136 anos em segundos).
+
+  Args:
+      duration_minutes (float): Duração da simulação em minutos.
+      speedup_factor (int): Fator de aceleração da simulação.
+      temp_precision (str): Precisão de ponto flutuante ('float16', 'float32', 'float64').
+          float16 tem 11 bits de mantissa: entre 32 e 64 °C o passo é de 0,03125 °C,
+          suficiente para a resolução do sensor (~0,3 °C), mas não para dados de
+          maior precisão; nesse caso use 'float32'.
+      heater_type (str): Tipo de dado para Q1 e Q2 ('bool', 1 byte por amostra, ou
+          'int8', que grava 0/100 como nos arquivos antigos).
+      setpoints_t1, setpoints_t2 (dict): Mapas tempo->setpoint (em segundos).
+      output_format (str): Formato do arquivo salvo: 'csv' (lido pelas análises),
+          'parquet' ou 'feather' (Arrow IPC); os dois binários são comprimidos com zstd,
+          mantêm os tipos das colunas e são bem mais rápidos de gravar e menores.
+  """
   allowed_precisions = ['float64', 'float32', 'float16']
   allowed_heater_types = ['int8', 'bool']
+  allowed_formats = ['csv', 'parquet', 'feather']
   assert temp_precision in allowed_precisions
   assert heater_type in allowed_heater_types
+  assert output_format in allowed_formats
 
   tclab.setup(connected=False, speedup=speedup_factor)
   tf = duration_minutes * 60
   n = int(tf) + 1
 
-  with tclab.TCLabModel() as lab:
-    T1_data, T2_data, Q1_data, Q2_data, times = [], [], [], [], []
-
-    if setpoints_t1 is None:
-      setpoints_t1 = {0: 24}
-    if setpoints_t2 is None:
-      setpoints_t2 = {0: 24}
-
-    current_sp1 = setpoints_t1[0]
-    current_sp2 = setpoints_t2[0]
-
-    print(
-        f"Iniciando simulação de {duration_minutes:.0f} min "
-        f"(≈ {duration_minutes/60:.2f} h) com speedup {speedup_factor}x"
-    )
-    print(f"Precisão: {temp_precision}, Tipo do Aquecedor: {heater_type}")
-
-    try:
-      for i in range(n):
-        # Atualiza setpoints se definidos no tempo atual
-        if i in setpoints_t1:
-          current_sp1 = setpoints_t1[i]
-        if i in setpoints_t2:
-          current_sp2 = setpoints_t2[i]
-
-        # --- Controle ON/OFF com histerese ---
-        hysteresis = 0.5  # valor de histerese em °C
-
-        # Inicializa estados anteriores dos aquecedores
-        if i == 0:
-          prev_q1 = 0
-          prev_q2 = 0
-
-        # Controle com histerese para Q1
-        if lab.T1 < current_sp1 - hysteresis:
-          q1 = 1
-        elif lab.T1 > current_sp1 + hysteresis:
-          q1 = 0
-        else:
-          q1 = prev_q1  # mantém estado anterior
-
-        # Controle com histerese para Q2
-        if lab.T2 < current_sp2 - hysteresis:
-          q2 = 1
-        elif lab.T2 > current_sp2 + hysteresis:
-          q2 = 0
-        else:
-          q2 = prev_q2  # mantém estado anterior
-
-        prev_q1 = q1
-        prev_q2 = q2
-
-        lab.Q1(100 if q1 else 0)
-        lab.Q2(100 if q2 else 0)
-
-        # Armazena dados
-        times.append(i)
-        T1_data.append(lab.T1)
-        T2_data.append(lab.T2)
-        Q1_data.append(lab.U1)
-        Q2_data.append(lab.U2)
-
-        if i % 3600 == 0:
-          print(
-              f"t = {i/3600:.1f}h | "
-              f"T1={lab.T1:.2f}°C (SP1={current_sp1}), "
-              f"T2={lab.T2:.2f}°C (SP2={current_sp2})"
-          )
-
-    except KeyboardInterrupt:
-      print("Simulação interrompida pelo usuário.")
-
-  # --- Conversão e salvamento ---
-  print("\nConvertendo tipos de dados...")
-  data = pd.DataFrame({
-      'Time (s)': times,
-      'T1': np.array(T1_data, dtype=temp_precision),
-      'T2': np.array(T2_data, dtype=temp_precision),
-      'Q1': np.array(Q1_data, dtype=np.int8 if heater_type == 'int8' else np.bool_),
-      'Q2': np.array(Q2_data, dtype=np.int8 if heater_type == 'int8' else np.bool_)
-  })
-
-  filename = f"output/tclab_data_histerese_{temp_precision}_{heater_type}_{int(duration_minutes)}min.csv"
-  data.to_csv(filename, index=False)
+  # Bloco de tamanho fixo (um vetor por coluna), gravado no arquivo a cada
+  # BLOCK_ROWS segundos: a memória usada não depende da duração da simulação
+  heater_dtype = np.int8 if heater_type == 'int8' else np.bool_
+  block = {
+      'Time (s)': np.empty(BLOCK_ROWS, dtype=np.uint32),
+      'T1': np.empty(BLOCK_ROWS, dtype=temp_precision),
+      'T2': np.empty(BLOCK_ROWS, dtype=temp_precision),
+      'Q1': np.empty(BLOCK_ROWS, dtype=heater_dtype),
+      'Q2': np.empty(BLOCK_ROWS, dtype=heater_dtype),
+  }
+  T1_data, T2_data, Q1_data, Q2_data = block['T1'], block['T2'], block['Q1'], block['Q2']
+  rows = 0  # linhas já gravadas
+  j = 0     # linhas preenchidas no bloco atual
+
+  filename = f"output/tclab_data_histerese_{temp_precision}_{heater_type}_{int(duration_minutes)}min.{output_format}"
+  writer = open_writer(filename, output_format, block)
+  # fecha o writer mesmo se a simulação falhar, para o arquivo manter o rodapé
+  try:
+    with tclab.TCLabModel() as lab:
+      if setpoints_t1 is None:
+        setpoints_t1 = {0: 24}
+      if setpoints_t2 is None:
+        setpoints_t2 = {0: 24}
+
+      # Setpoint vigente em cada segundo, calculado uma vez antes do laço
+      sp1_arr = setpoint_schedule(setpoints_t1, n)
+      sp2_arr = setpoint_schedule(setpoints_t2, n)
+
+      print(
+          f"Iniciando simulação de {duration_minutes:.0f} min "
+          f"(≈ {duration_minutes/60:.2f} h) com speedup {speedup_factor}x"
+      )
+      print(f"Precisão: {temp_precision}, Tipo do Aquecedor: {heater_type}")
+
+      hysteresis = 0.5  # valor de histerese em °C
+      # estados anteriores dos aquecedores
+      prev_q1 = 0
+      prev_q2 = 0
+      # última saída aplicada a cada aquecedor (-1: nenhuma ainda)
+      applied_q1 = applied_q2 = -1
+
+      try:
+        for i in range(n):
+          current_sp1 = sp1_arr[i]
+          current_sp2 = sp2_arr[i]
+
+          # --- Controle ON/OFF com histerese ---
+          q1, q2 = _onoff_hysteresis(
+              lab.T1, current_sp1, lab.T2, current_sp2, prev_q1, prev_q2, hysteresis)
+
+          prev_q1 = q1
+          prev_q2 = q2
+
+          # só aciona os aquecedores quando a saída muda
+          if q1 != applied_q1:
+            lab.Q1(100 if q1 else 0)
+            applied_q1 = q1
+          if q2 != applied_q2:
+            lab.Q2(100 if q2 else 0)
+            applied_q2 = q2
+
+          # Armazena dados
+          T1_data[j] = lab.T1
+          T2_data[j] = lab.T2
+          Q1_data[j] = lab.U1
+          Q2_data[j] = lab.U2
+          j += 1
+          if j == BLOCK_ROWS:
+            # pausa o relógio da simulação enquanto o bloco é gravado
+            tclab.labtime.stop()
+            write_block(writer, block, rows, j)
+            tclab.labtime.start()
+            rows += j
+            j = 0
+
+          if i % 3600 == 0:
+            print(
+                f"t = {i/3600:.1f}h | "
+                f"T1={lab.T1:.2f}°C (SP1={current_sp1}), "
+                f"T2={lab.T2:.2f}°C (SP2={current_sp2})"
+            )
+
+      except KeyboardInterrupt:
+        print("Simulação interrompida pelo usuário.")
+
+    # --- Salvamento ---
+    # grava o bloco parcial (se interrompida, apenas as linhas já preenchidas)
+    if j:
+      write_block(writer, block, rows, j)
+      rows += j
+  finally:
+    writer.close()
 
   print(f"Dados salvos em '{filename}'")
-  print("\nInformações de memória:")
-  data.info(memory_usage='deep')
+  print(f"Linhas: {rows:,} | Tamanho do arquivo: {os.path.getsize(filename):,} bytes")
 
 
 def create_daily_pattern(base_pattern, total_days, max_temp, fluctuation=3):
@@ -123,6 +179,13 @@ def create_daily_pattern(base_pattern, total_days, max_temp, fluctuation=3):
 
 
 if __name__ == '__main__':
+  import argparse
+
+  parser = argparse.ArgumentParser(description="Simulação do TCLab com controle ON/OFF com histerese")
+  parser.add_argument('--format', choices=['csv', 'parquet', 'feather'], default='csv',
+                      help="Formato do arquivo em output/ (padrão: csv, lido pelas análises)")
+  args = parser.parse_args()
+
   speedup_factor = 100000
 
   experiment_days = 7
@@ -159,4 +222,5 @@ if __name__ == '__main__':
   duration_minutes = experiment_days * 24 * 60
 
   run_simulation(duration_minutes, speedup_factor,
-                 setpoints_t1=setpoints_t1, setpoints_t2=setpoints_t2)
+                 setpoints_t1=setpoints_t1, setpoints_t2=setpoints_t2,
+                 output_format=args.format)
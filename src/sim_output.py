@@ -0,0 +1,79 @@
+"""
+Funções compartilhadas pelas simulações do TCLab (main-sh.py e main-ch.py).
+
+Estratégia usada:
+- Setpoints expandidos uma única vez para um vetor com o valor vigente em cada segundo.
+- Saída gravada em blocos de tamanho fixo (BLOCK_ROWS linhas), em CSV, Parquet
+  ou Feather v2 (Arrow IPC), sem manter a simulação inteira em memória.
+
+API principal:
+- setpoint_schedule(setpoints, n)
+- open_writer(filename, output_format, block)
+- write_block(writer, block, start, count)
+"""
+from __future__ import annotations
+
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow as pa  # type: ignore
+    import pyarrow.parquet as pq  # type: ignore
+    _HAS_PYARROW = True
+except Exception:
+    pa = pq = None  # type: ignore
+    _HAS_PYARROW = False
+
+
+# Linhas acumuladas em memória antes de cada gravação no arquivo de saída
+BLOCK_ROWS = 65536
+
+
+def setpoint_schedule(setpoints: dict, n: int) -> np.ndarray:
+    """
+    Expande um mapa tempo->setpoint (em segundos) para um vetor com o setpoint
+    vigente em cada segundo de 0 a n-1 (o último valor definido é mantido).
+    O mapa deve conter o tempo 0.
+    """
+    sp = np.full(n, np.nan)
+    for t, value in setpoints.items():
+        if 0 <= t < n:
+            sp[t] = value
+    # índice do último setpoint definido até cada segundo (forward fill)
+    last = np.where(np.isnan(sp), 0, np.arange(n))
+    np.maximum.accumulate(last, out=last)
+    return sp[last]
+
+
+def open_writer(filename: str, output_format: str, block: dict):
+    """
+    Abre o arquivo de saída para gravação em blocos.
+
+    Parquet: ParquetWriter com compressão zstd (cada bloco vira um row group).
+    Feather: arquivo Arrow IPC (Feather v2) com compressão zstd (um record batch por bloco).
+    CSV: arquivo texto com o cabeçalho já escrito.
+
+    O chamador deve fechar o writer mesmo em caso de erro: sem o rodapé, os
+    arquivos Parquet e Feather ficam ilegíveis.
+    """
+    if output_format in ("parquet", "feather"):
+        if not _HAS_PYARROW:
+            raise RuntimeError("pyarrow não está instalado. Use output_format='csv'.")
+        schema = pa.schema([(name, pa.from_numpy_dtype(col.dtype)) for name, col in block.items()])
+        if output_format == "feather":
+            options = pa.ipc.IpcWriteOptions(compression=pa.Codec("zstd", compression_level=3))
+            return pa.ipc.new_file(filename, schema, options=options)
+        return pq.ParquetWriter(filename, schema, compression="zstd", compression_level=3)
+    f = open(filename, "w", newline="")
+    f.write(",".join(block) + "\n")
+    return f
+
+
+def write_block(writer, block: dict, start: int, count: int) -> None:
+    """Grava as `count` primeiras linhas do bloco; o tempo começa em `start` segundos."""
+    block["Time (s)"][:count] = np.arange(start, start + count)
+    columns = {name: col[:count] for name, col in block.items()}
+    if _HAS_PYARROW and isinstance(writer, (pq.ParquetWriter, pa.ipc.RecordBatchFileWriter)):
+        writer.write_table(pa.table(columns))
+    else:
+        pd.DataFrame(columns).to_csv(writer, header=False, index=False)